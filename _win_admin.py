@@ -0,0 +1,52 @@
+"""
+Shared Windows helpers for the blocker scripts: elevation, and running
+helper processes without a console window.
+Used by blocker.py, tray_blocker.py, and setup_autostart.py.
+"""
+
+import ctypes
+import os
+import subprocess
+import sys
+
+# Helper processes (ipconfig, taskkill, schtasks, ...) run hidden so no
+# console window flashes up; pass both to subprocess. Built once at import.
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+if hasattr(subprocess, "STARTUPINFO"):
+    HIDDEN_STARTUPINFO = subprocess.STARTUPINFO()
+    HIDDEN_STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    HIDDEN_STARTUPINFO.wShowWindow = 0  # SW_HIDE
+else:
+    HIDDEN_STARTUPINFO = None
+
+# Elevation can't change during the process lifetime, so check it once
+_IS_ADMIN = None
+
+
+def is_admin():
+    """Check if the current process is running with administrator privileges."""
+    global _IS_ADMIN
+    if _IS_ADMIN is None:
+        try:
+            _IS_ADMIN = bool(ctypes.windll.shell32.IsUserAnAdmin())
+        except Exception:
+            _IS_ADMIN = False
+    return _IS_ADMIN
+
+
+def run_as_admin(script):
+    """Re-launch `script` elevated with the current arguments, then exit."""
+    params = subprocess.list2cmdline([os.path.abspath(script)] + sys.argv[1:])
+    ctypes.windll.shell32.ShellExecuteW(
+        None, "runas", sys.executable, params, None, 0
+    )
+    sys.exit(0)
+
+
+def find_pythonw():
+    """Find pythonw.exe path for silent execution."""
+    python_dir = os.path.dirname(sys.executable)
+    pythonw = os.path.join(python_dir, "pythonw.exe")
+    if os.path.exists(pythonw):
+        return pythonw
+    return sys.executable
@@ -7,10 +7,26 @@ Runs at startup and keeps everything blocked.
 
 import ctypes
 import json
+import mmap
 import os
+import re
+import signal
+import struct
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from ctypes import wintypes
+
+import _win_admin
+from _win_admin import CREATE_NO_WINDOW, HIDDEN_STARTUPINFO, is_admin
+
+# orjson is optional — a faster, C-accelerated JSON codec for the config file
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ---------------------------------------------------------------------------
 # Fix for pythonw.exe: stdout/stderr are None when there's no console.
@@ -26,16 +42,69 @@ if sys.stderr is None:
 HOSTS_PATH = r"C:\Windows\System32\drivers\etc\hosts"
 BLOCK_MARKER_START = "# === WEBSITE BLOCKER START ==="
 BLOCK_MARKER_END = "# === WEBSITE BLOCKER END ==="
+# Byte forms — the hosts file is edited as raw bytes end to end
+BLOCK_MARKER_START_B = BLOCK_MARKER_START.encode("ascii")
+BLOCK_MARKER_END_B = BLOCK_MARKER_END.encode("ascii")
+_EOL = os.linesep.encode("ascii")
 REDIRECT_IP = "127.0.0.1"
+_REDIRECT_PREFIX = (REDIRECT_IP + " ").encode("ascii")
+# Matches one of our hosts entries, capturing the hostname(s) after the IP
+_ENTRY_RE = re.compile(
+    rb"^" + re.escape(REDIRECT_IP.encode("ascii")) + rb"[ \t]+([^\r\n]+)", re.M
+)
+# Past this many sites, hosts entries are grouped several per line — the
+# Windows resolver slows down badly on hosts files with lots of lines
+HOSTS_GROUPING_THRESHOLD = 50
+# Windows only honours the first 9 hostnames on a single hosts line
+HOSTS_PER_LINE = 9
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_FILE = os.path.join(SCRIPT_DIR, "blocked_sites.json")
 LOCK_FILE = os.path.join(SCRIPT_DIR, "blocker.lock")
 
+# Returned by Win32 handle-creating calls on failure (snapshots, files,
+# transactions)
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+# Private DLL instances, so the prototypes declared here don't change the
+# shared ctypes.windll function objects other code (e.g. pystray) uses.
+# None off Windows; callers already treat a failed Win32 call as unavailable.
+try:
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _kernel32.CreateToolhelp32Snapshot.restype = ctypes.c_void_p
+    _kernel32.OpenProcess.restype = ctypes.c_void_p
+    _kernel32.CreateFileW.restype = ctypes.c_void_p
+except (AttributeError, OSError):
+    _kernel32 = None
+try:
+    _ktmw32 = ctypes.WinDLL("ktmw32")
+    _ktmw32.CreateTransaction.restype = ctypes.c_void_p
+except (AttributeError, OSError):
+    _ktmw32 = None
+
+# Another process (the daemon, the CLI, an antivirus scan) can hold a file
+# open without delete sharing for a moment; replacing it is retried this many
+# times, REPLACE_RETRY_DELAY seconds apart, before giving up
+REPLACE_RETRIES = 5
+REPLACE_RETRY_DELAY = 0.05
+
 # Default blocked apps — process names as they appear in Task Manager
-DEFAULT_BLOCKED_APPS = [
+DEFAULT_BLOCKED_APPS = (
     "TikTok.exe",
     "Instagram.exe",
-]
+)
+
+# Daemon cadence: blocked apps are scanned for every APP_SCAN_INTERVAL seconds;
+# site/URL blocks are re-applied on config or hosts changes, and re-asserted
+# every BLOCK_HEARTBEAT seconds to undo tampering (e.g. registry edits)
+APP_SCAN_INTERVAL = 30
+BLOCK_HEARTBEAT = 300
+
+# Routine status lines ("Blocked N sites.", ...); the daemon and tray turn
+# these off so a long-running process isn't writing to the console every tick
+VERBOSE = True
+
+# Commands that only read state and never need elevation
+NO_ADMIN_COMMANDS = frozenset({"list", "status", "help", "listapps"})
 
 # Browser policy registry paths for URLBlocklist
 BROWSER_POLICY_KEYS = [
@@ -45,28 +114,24 @@ BROWSER_POLICY_KEYS = [
 ]
 
 
-def is_admin():
-    """Check if the script is running with administrator privileges."""
-    try:
-        return ctypes.windll.shell32.IsUserAnAdmin()
-    except Exception:
-        return False
-
-
 def run_as_admin():
     """Re-launch the script with administrator privileges."""
-    script = os.path.abspath(__file__)
-    params = " ".join(f'"{arg}"' for arg in sys.argv[1:])
-    ctypes.windll.shell32.ShellExecuteW(
-        None, "runas", sys.executable, f'"{script}" {params}', None, 0
-    )
-    sys.exit(0)
+    # Never raise a UAC prompt for read-only commands
+    if len(sys.argv) > 1 and sys.argv[1].lower() in NO_ADMIN_COMMANDS:
+        return
+    _win_admin.run_as_admin(__file__)
 
 
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
 
+# (mtime_ns, size, parsed config), reused until the file's mtime or size
+# changes. Replaced as one tuple so threads never mix one read's data with
+# another's stamp.
+_CONFIG_CACHE = (None, None, None)
+
+
 def _default_config():
     """Return the default config dict."""
     return {
@@ -90,20 +155,45 @@ def _default_config():
             "m.youtube.com/shorts",
             "m.youtube.com/shorts/*",
         ],
-        "blocked_apps": DEFAULT_BLOCKED_APPS,
+        "blocked_apps": list(DEFAULT_BLOCKED_APPS),
     }
 
 
+def _json_loads(raw):
+    """Parse JSON bytes, using orjson when it's installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data):
+    """Serialize to indented JSON bytes, using orjson when it's installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _get_config():
+    """Return the parsed config, only re-reading the file when it changed."""
+    global _CONFIG_CACHE
+    st = os.stat(CONFIG_FILE)
+    mtime, size, data = _CONFIG_CACHE
+    if mtime != st.st_mtime_ns or size != st.st_size:
+        with open(CONFIG_FILE, "rb") as f:
+            data = _json_loads(f.read())
+        _CONFIG_CACHE = (st.st_mtime_ns, st.st_size, data)
+    return data
+
+
 def load_full_config():
     """Load the full config dict, creating defaults if needed."""
-    if not os.path.exists(CONFIG_FILE):
+    try:
+        data = _get_config()
+    except FileNotFoundError:
         defaults = _default_config()
-        _write_config(defaults)
+        save_config(defaults)
         return defaults
 
-    with open(CONFIG_FILE, "r") as f:
-        data = json.load(f)
-
     # Ensure all keys exist (for configs from older versions)
     changed = False
     for key in ("blocked_sites", "blocked_urls", "blocked_apps"):
@@ -111,20 +201,67 @@ def load_full_config():
             data[key] = []
             changed = True
     if changed:
-        _write_config(data)
+        save_config(data)
+
+    # Hand out copies so callers can mutate the lists without touching the cache
+    return _copy_config(data)
 
-    return data
 
+def _copy_config(data):
+    """Copy a config dict deep enough that its lists can be mutated."""
+    return {k: list(v) if isinstance(v, list) else v for k, v in data.items()}
 
-def _write_config(data):
-    """Write the full config dict to disk."""
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+
+def _atomic_write(path, content, move=os.replace):
+    """Replace `path` with `content` (bytes) via a temp file and `move`.
+
+    Each writer gets its own uniquely named temp file, so the CLI and the
+    daemon can't trample each other's. The move is retried briefly on
+    PermissionError, and the temp file is removed if it never lands.
+
+    Returns the stat of the written file, taken before the move (a rename
+    keeps mtime and size) so a concurrent replace can't be mistaken for ours.
+    """
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    moved = False
+    try:
+        with os.fdopen(fd, "wb", buffering=0) as f:
+            f.write(content)
+        # Only we know the temp name, so this stat is guaranteed to be ours
+        st = os.stat(tmp)
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                move(tmp, path)
+                moved = True
+                return st
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_DELAY)
+    finally:
+        if not moved:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def save_config(data):
+    """Write the full config dict to disk atomically."""
+    global _CONFIG_CACHE
+    # Swap a complete temp file in, so a daemon reading concurrently never
+    # sees a half-written JSON file
+    st = _atomic_write(CONFIG_FILE, _json_dumps(data))
+
+    # Stamp the cache so the next load doesn't re-read what we just wrote
+    _CONFIG_CACHE = (st.st_mtime_ns, st.st_size, _copy_config(data))
 
 
 def load_config():
-    """Load the list of blocked websites."""
-    return load_full_config().get("blocked_sites", [])
+    """Load the set of blocked websites (lowercased)."""
+    return {site.lower() for site in load_full_config().get("blocked_sites", [])}
 
 
 def load_blocked_apps():
@@ -137,158 +274,604 @@ def load_blocked_urls():
     return load_full_config().get("blocked_urls", [])
 
 
-def save_config(sites, apps=None):
-    """Save blocked websites (and optionally apps) to the config file."""
-    data = load_full_config() if os.path.exists(CONFIG_FILE) else _default_config()
-    data["blocked_sites"] = sites
-    if apps is not None:
-        data["blocked_apps"] = apps
-    _write_config(data)
-
-
-def save_blocked_apps(apps):
-    """Save the blocked apps list, preserving everything else."""
-    data = load_full_config()
-    data["blocked_apps"] = apps
-    _write_config(data)
-
-
-def save_blocked_urls(urls):
-    """Save the blocked URLs list, preserving everything else."""
-    data = load_full_config()
-    data["blocked_urls"] = urls
-    _write_config(data)
-
-
 # ---------------------------------------------------------------------------
 # Website blocking (hosts file)
 # ---------------------------------------------------------------------------
 
 def flush_dns():
     """Flush the Windows DNS cache so blocked sites take effect immediately."""
+    # ipconfig /flushdns is just a wrapper around this dnsapi export —
+    # calling it directly saves spawning a process
+    try:
+        if ctypes.windll.dnsapi.DnsFlushResolverCache():
+            return
+    except Exception:
+        pass
+
     try:
         subprocess.call(
             ["ipconfig", "/flushdns"],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
-            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            startupinfo=HIDDEN_STARTUPINFO,
+            creationflags=CREATE_NO_WINDOW,
         )
     except Exception:
         pass
 
 
+# (mtime_ns, size, content) of the last hosts read or write. Always replaced
+# as one tuple, so a thread can never pair a new mtime with old content.
+_HOSTS_CACHE = (None, None, b"")
+
+
+def _cache_hosts(content, st):
+    """Record `content` as the hosts bytes matching stat result `st`."""
+    global _HOSTS_CACHE
+    _HOSTS_CACHE = (st.st_mtime_ns, st.st_size, bytes(content))
+
+
 def read_hosts():
-    """Read the current hosts file content."""
+    """Read the current hosts file content as raw bytes.
+
+    The file is only re-read when its mtime or size changed since the last
+    read or write.
+    """
+    global _HOSTS_CACHE
     try:
-        with open(HOSTS_PATH, "r") as f:
-            return f.read()
+        st = os.stat(HOSTS_PATH)
     except FileNotFoundError:
-        return ""
+        _HOSTS_CACHE = (None, None, b"")
+        return b""
+    mtime, size, content = _HOSTS_CACHE
+    if mtime == st.st_mtime_ns and size == st.st_size:
+        return content
 
+    try:
+        with open(HOSTS_PATH, "rb") as f:
+            # Map the file instead of streaming it through the buffered reader
+            # — ad-block style hosts files can run to megabytes
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    content = mm[:]
+            except ValueError:
+                # Empty files can't be mapped
+                content = b""
+    except FileNotFoundError:
+        _HOSTS_CACHE = (None, None, b"")
+        return b""
 
-def block_sites(sites):
-    """Add blocked sites to the hosts file and flush DNS."""
-    content = read_hosts()
-    content = remove_blocker_entries(content)
+    _HOSTS_CACHE = (st.st_mtime_ns, st.st_size, content)
+    return content
 
-    block_lines = [BLOCK_MARKER_START]
-    for site in sites:
-        block_lines.append(f"{REDIRECT_IP} {site}")
-    block_lines.append(BLOCK_MARKER_END)
 
-    new_content = content.rstrip("\n") + "\n\n" + "\n".join(block_lines) + "\n"
+MOVEFILE_REPLACE_EXISTING = 0x1
+MOVEFILE_WRITE_THROUGH = 0x8
 
-    with open(HOSTS_PATH, "w") as f:
-        f.write(new_content)
 
-    flush_dns()
-    print(f"Blocked {len(sites)} sites.")
+def _move_over(src, dst):
+    """Move `src` over `dst`, flushing the rename through to disk."""
+    try:
+        moved = _kernel32.MoveFileExW(
+            src, dst, MOVEFILE_REPLACE_EXISTING | MOVEFILE_WRITE_THROUGH
+        )
+    except Exception:
+        moved = False
+    if not moved:
+        os.replace(src, dst)
 
 
-def unblock_sites():
-    """Remove all blocker entries from the hosts file."""
-    content = read_hosts()
-    new_content = remove_blocker_entries(content)
+def _write_hosts(content):
+    """Atomically replace the hosts file with `content` (bytes).
+
+    The new content goes to a temp file next to the hosts file in a single
+    unbuffered write, then is moved over it — a crash mid-write can never
+    leave a truncated hosts file behind. Returns the written file's
+    st_mtime_ns.
+    """
+    st = _atomic_write(HOSTS_PATH, content, move=_move_over)
+    # Seed the read cache so the next read_hosts() doesn't reload our own write
+    _cache_hosts(content, st)
+    return st.st_mtime_ns
+
+
+# (site tuple, hosts mtime_ns) from the last block_sites() that left the file
+# in the desired state — lets the daemon skip even the read when neither
+# moved. Replaced as one tuple so threads never see a mismatched pair.
+_LAST_HOSTS_STATE = (None, None)
+
 
-    with open(HOSTS_PATH, "w") as f:
-        f.write(new_content)
+def _hosts_mtime():
+    """Return the hosts file's st_mtime_ns, or None if it doesn't exist."""
+    try:
+        return os.stat(HOSTS_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+
+# (sorted site tuple, block bytes) for the last built block section
+_BLOCK_BODY_CACHE = (None, b"")
+
+
+def _build_block(sites):
+    """Build the marker-delimited hosts section for a sorted site list.
+
+    The result is cached, so an unchanged list costs a tuple compare.
+    """
+    global _BLOCK_BODY_CACHE
+    key = tuple(sites)
+    cached_key, body = _BLOCK_BODY_CACHE
+    if cached_key == key:
+        return body
+
+    buf = bytearray(BLOCK_MARKER_START_B)
+    buf += _EOL
+    if len(sites) > HOSTS_GROUPING_THRESHOLD:
+        for i in range(0, len(sites), HOSTS_PER_LINE):
+            buf += _REDIRECT_PREFIX
+            buf += " ".join(sites[i:i + HOSTS_PER_LINE]).encode()
+            buf += _EOL
+    else:
+        for site in sites:
+            buf += _REDIRECT_PREFIX
+            buf += site.encode()
+            buf += _EOL
+    buf += BLOCK_MARKER_END_B
+    buf += _EOL
+    body = bytes(buf)
+    _BLOCK_BODY_CACHE = (key, body)
+    return body
+
+
+def block_sites(sites):
+    """Add blocked sites to the hosts file and flush DNS.
+
+    `sites` can be any iterable; entries are written in sorted order.
+    Returns True if the hosts file was rewritten, False if it already
+    contained exactly this block list.
+    """
+    global _LAST_HOSTS_STATE
+    sites = sorted(sites)
+    key = tuple(sites)
+    last_key, last_mtime = _LAST_HOSTS_STATE
+    if last_key == key and last_mtime is not None and last_mtime == _hosts_mtime():
+        if VERBOSE:
+            print(f"Blocked {len(sites)} sites.")
+        return False
+
+    current = read_hosts()
+    # Stamp of the bytes we diff against; None (no fast path next time) if
+    # another thread replaced the cache in between
+    mtime, _, cached = _HOSTS_CACHE
+    if cached is not current:
+        mtime = None
+    new_content = bytearray(_strip_block(current).rstrip(b"\r\n"))
+    new_content += _EOL
+    new_content += _EOL
+    new_content += _build_block(sites)
+    changed = new_content != current
+    if changed:
+        mtime = _write_hosts(new_content)
+
+    _LAST_HOSTS_STATE = (key, mtime)
+
+    if changed:
+        flush_dns()
+    if VERBOSE:
+        print(f"Blocked {len(sites)} sites.")
+    return changed
+
+
+def add_sites_to_block(sites, added):
+    """Insert newly `added` sites into an existing block without a full rewrite.
+
+    `sites` is the complete desired list (including `added`). When the
+    hosts file ends with exactly what block_sites() would have written for
+    the old list, only the bytes from the first new entry onwards are
+    rewritten in place. Anything else (grouped entries, an edited or
+    missing block, content after the block, or the file changing under us)
+    falls back to block_sites(). Returns True if the hosts file changed.
+    """
+    global _LAST_HOSTS_STATE
+    sites = sorted(sites)
+    added = set(added)
+    old = [site for site in sites if site not in added]
+    if not added or len(sites) > HOSTS_GROUPING_THRESHOLD:
+        return block_sites(sites)
+
+    current = read_hosts()
+    mtime, size, cached = _HOSTS_CACHE
+    start, _ = _find_block_region(current)
+    if start is None or cached is not current:
+        return block_sites(sites)
+    head = current[:start]
+    if (
+        head != head.rstrip(b"\r\n") + _EOL + _EOL
+        or current[start:] != _build_block(old)
+    ):
+        return block_sites(sites)
+
+    # Everything before the first new entry's line is already on disk
+    first = min(added)
+    offset = start + len(BLOCK_MARKER_START_B) + len(_EOL)
+    for site in old:
+        if site > first:
+            break
+        offset += len(_REDIRECT_PREFIX) + len(site.encode()) + len(_EOL)
+
+    new_content = head + _build_block(sites)
+    with open(HOSTS_PATH, "r+b") as f:
+        # The offset is only valid for the bytes we parsed; if the daemon
+        # replaced the file since, redo it in full. While we hold the file
+        # open, nobody else can replace it.
+        st = os.fstat(f.fileno())
+        unchanged = st.st_mtime_ns == mtime and st.st_size == size
+        if unchanged:
+            f.seek(offset)
+            f.write(new_content[offset:])
+            f.truncate()
+            f.flush()
+            # Stamp from our own handle, not a later stat of the path
+            st = os.fstat(f.fileno())
+    if not unchanged:
+        return block_sites(sites)
+    _cache_hosts(new_content, st)
+    _LAST_HOSTS_STATE = (tuple(sites), st.st_mtime_ns)
 
     flush_dns()
-    print("All sites unblocked.")
+    if VERBOSE:
+        print(f"Blocked {len(sites)} sites.")
+    return True
 
 
-def remove_blocker_entries(content):
-    """Remove the blocker section from hosts file content."""
-    lines = content.split("\n")
-    new_lines = []
-    inside_block = False
+def unblock_sites():
+    """Remove all blocker entries from the hosts file.
+
+    Returns True if there was a block section to remove.
+    """
+    global _LAST_HOSTS_STATE
+    current = read_hosts()
+    _LAST_HOSTS_STATE = (None, None)
+    if BLOCK_MARKER_START_B not in current:
+        # Nothing of ours in the file — skip the rewrite and the flush
+        if VERBOSE:
+            print("All sites unblocked.")
+        return False
 
-    for line in lines:
-        if line.strip() == BLOCK_MARKER_START:
-            inside_block = True
-            continue
-        if line.strip() == BLOCK_MARKER_END:
-            inside_block = False
-            continue
-        if not inside_block:
-            new_lines.append(line)
+    new_content = _strip_block(current)
+    changed = new_content != current
+    if changed:
+        _write_hosts(new_content)
 
-    return "\n".join(new_lines)
+    # Flush once, and only if the resolver could be holding blocked entries
+    if changed:
+        flush_dns()
+    if VERBOSE:
+        print("All sites unblocked.")
+    return changed
+
+
+def _find_block_region(buf):
+    """Locate the blocker section in raw hosts file bytes.
+
+    Returns (start, end) offsets of the start and end markers. Either is
+    None if that marker isn't present.
+    """
+    start = buf.find(BLOCK_MARKER_START_B)
+    if start == -1:
+        return None, None
+    end = buf.find(BLOCK_MARKER_END_B, start)
+    return start, (end if end != -1 else None)
+
+
+def _strip_block(buf):
+    """Remove the blocker section from raw hosts file bytes."""
+    start, end = _find_block_region(buf)
+    if start is None:
+        return buf
+    if end is None:
+        # No end marker — everything after the start marker is ours
+        return buf[:start]
+
+    # Drop everything up to and including the end marker's line break
+    head = buf[:start].rstrip(b"\r\n")
+    line_end = buf.find(b"\n", end)
+    tail = buf[line_end + 1:] if line_end != -1 else b""
+    if not head:
+        return tail
+    return head + _EOL + tail
 
 
 # ---------------------------------------------------------------------------
 # App blocking (process killing)
 # ---------------------------------------------------------------------------
 
+# Win32 process access rights / snapshot flags
+PROCESS_TERMINATE = 0x0001
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+STILL_ACTIVE = 259
+ERROR_ACCESS_DENIED = 5
+TH32CS_SNAPPROCESS = 0x00000002
+
+
+class PROCESSENTRY32W(ctypes.Structure):
+    """Process record filled in by Process32FirstW / Process32NextW."""
+    _fields_ = [
+        ("dwSize", wintypes.DWORD),
+        ("cntUsage", wintypes.DWORD),
+        ("th32ProcessID", wintypes.DWORD),
+        ("th32DefaultHeapID", ctypes.c_size_t),
+        ("th32ModuleID", wintypes.DWORD),
+        ("cntThreads", wintypes.DWORD),
+        ("th32ParentProcessID", wintypes.DWORD),
+        ("pcPriClassBase", wintypes.LONG),
+        ("dwFlags", wintypes.DWORD),
+        ("szExeFile", ctypes.c_wchar * 260),
+    ]
+
+
+def _enum_processes():
+    """List (lowercased name, pid) for running processes.
+
+    Takes one Toolhelp32 snapshot, which carries every process name, so no
+    per-process handles have to be opened.
+    """
+    snap = _kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if snap in (None, INVALID_HANDLE_VALUE):
+        raise ctypes.WinError()
+
+    processes = []
+    entry = PROCESSENTRY32W()
+    entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+    try:
+        ok = _kernel32.Process32FirstW(ctypes.c_void_p(snap), ctypes.byref(entry))
+        while ok:
+            processes.append((entry.szExeFile.lower(), entry.th32ProcessID))
+            ok = _kernel32.Process32NextW(ctypes.c_void_p(snap), ctypes.byref(entry))
+    finally:
+        _kernel32.CloseHandle(ctypes.c_void_p(snap))
+    return processes
+
+
+def _terminate_process(pid):
+    """Terminate a process by PID. Returns True on success."""
+    handle = _kernel32.OpenProcess(PROCESS_TERMINATE, False, pid)
+    if not handle:
+        return False
+    try:
+        return bool(_kernel32.TerminateProcess(ctypes.c_void_p(handle), 1))
+    finally:
+        _kernel32.CloseHandle(ctypes.c_void_p(handle))
+
+
+def _pid_alive(pid):
+    """Check whether a process with this PID is still running."""
+    handle = _kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        # Access denied means the process exists but we may not inspect it
+        # (e.g. an elevated daemon seen from a normal shell); any other
+        # failure (ERROR_INVALID_PARAMETER) means there's no such PID
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+    try:
+        # An exited process stays openable while anyone holds a handle to it
+        code = wintypes.DWORD()
+        _kernel32.GetExitCodeProcess(ctypes.c_void_p(handle), ctypes.byref(code))
+        return code.value == STILL_ACTIVE
+    finally:
+        _kernel32.CloseHandle(ctypes.c_void_p(handle))
+
+
 def get_running_processes():
     """Get a set of currently running process names."""
+    try:
+        return frozenset(name for name, _ in _enum_processes())
+    except Exception:
+        pass
+
+    # Fallback: parse tasklist output
     try:
         output = subprocess.check_output(
             ["tasklist", "/FO", "CSV", "/NH"],
             stderr=subprocess.DEVNULL,
-            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            startupinfo=HIDDEN_STARTUPINFO,
+            creationflags=CREATE_NO_WINDOW,
         )
         processes = set()
-        for line in output.decode("utf-8", errors="ignore").strip().split("\n"):
-            line = line.strip()
-            if line:
-                # CSV format: "process.exe","PID","Session","Session#","Mem"
-                name = line.split(",")[0].strip('"')
-                processes.add(name.lower())
+        for line in output.decode("utf-8", errors="ignore").splitlines():
+            # CSV format: "process.exe","PID","Session","Session#","Mem"
+            # — only the first column is needed, so slice it out directly
+            end = line.find('","')
+            if end > 1:
+                processes.add(line[1:end].lower())
         return processes
     except Exception:
         return set()
 
 
 def kill_blocked_apps(apps):
-    """Kill any running processes that match the blocked apps list."""
+    """Kill any running processes that match the blocked apps list.
+
+    `apps` can be any collection of process names (list, tuple, set,
+    frozenset) — not a one-shot iterator; matching is case-insensitive.
+    """
     if not apps:
         return 0
 
-    running = get_running_processes()
-    killed = 0
+    blocked = {app.lower(): app for app in apps}
+    killed = set()
+    needs_taskkill = set()
 
-    for app in apps:
-        if app.lower() in running:
-            try:
-                subprocess.call(
-                    ["taskkill", "/F", "/IM", app],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
-                )
-                print(f"Killed blocked app: {app}")
-                killed += 1
-            except Exception:
-                pass
+    try:
+        for name, pid in _enum_processes():
+            app = blocked.get(name)
+            if app is None:
+                continue
+            if _terminate_process(pid):
+                killed.add(app)
+            else:
+                # Couldn't open it ourselves (e.g. access denied) — escalate
+                needs_taskkill.add(app)
+    except Exception:
+        # No Win32 process list — let taskkill find the processes by name
+        running = get_running_processes()
+        needs_taskkill = {app for name, app in blocked.items() if name in running}
+
+    if needs_taskkill:
+        # One taskkill call with multiple /IM flags instead of one per app
+        cmd = ["taskkill", "/F"]
+        for app in needs_taskkill:
+            cmd.extend(["/IM", app])
+        try:
+            subprocess.call(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                startupinfo=HIDDEN_STARTUPINFO,
+                creationflags=CREATE_NO_WINDOW,
+            )
+            killed |= needs_taskkill
+        except Exception:
+            pass
 
-    return killed
+    for app in apps:
+        if app in killed:
+            print(f"Killed blocked app: {app}")
+    return len(killed)
 
 
 # ---------------------------------------------------------------------------
 # URL path blocking (browser policy via registry)
 # ---------------------------------------------------------------------------
 
+def _read_policy_values(key):
+    """Return the {name: value} pairs currently stored under a policy key."""
+    import winreg
+
+    _, value_count, _ = winreg.QueryInfoKey(key)
+    values = {}
+    for i in range(value_count):
+        name, value, _ = winreg.EnumValue(key, i)
+        values[name] = value
+    return values
+
+
+def _clear_policy_values(key, names):
+    """Delete the named values from a policy key."""
+    import winreg
+
+    # Delete by name (collected up front), so no EnumValue index juggling
+    for name in list(names):
+        try:
+            winreg.DeleteValue(key, name)
+        except OSError:
+            pass
+
+
+def _write_policy_transacted(reg_path, values, stale):
+    """Apply a policy key update inside one kernel (KTM) transaction.
+
+    Deletes the `stale` value names and writes `values`, then commits, so
+    browsers never observe a half-written list. Returns False (with nothing
+    applied) if transactions aren't available or any step fails.
+    """
+    import winreg
+
+    if _ktmw32 is None or _kernel32 is None:
+        return False
+    try:
+        advapi32 = ctypes.windll.advapi32
+    except Exception:
+        return False
+
+    txn = _ktmw32.CreateTransaction(None, None, 0, 0, 0, 0, None)
+    if txn in (None, INVALID_HANDLE_VALUE):
+        return False
+    try:
+        # Predefined HKEYs are sign-extended 32-bit values
+        hklm = ctypes.c_void_p(ctypes.c_int32(winreg.HKEY_LOCAL_MACHINE).value)
+        hkey = ctypes.c_void_p()
+        disposition = wintypes.DWORD()
+        if advapi32.RegCreateKeyTransactedW(
+            hklm, reg_path, 0, None, 0, winreg.KEY_SET_VALUE | winreg.KEY_READ,
+            None, ctypes.byref(hkey), ctypes.byref(disposition),
+            ctypes.c_void_p(txn), None,
+        ):
+            return False
+        try:
+            for name in stale:
+                advapi32.RegDeleteValueW(hkey, name)
+            for name, url in values.items():
+                data = ctypes.create_unicode_buffer(url)
+                if advapi32.RegSetValueExW(
+                    hkey, name, 0, winreg.REG_SZ, data, ctypes.sizeof(data)
+                ):
+                    # Closing the transaction uncommitted rolls everything back
+                    return False
+        finally:
+            advapi32.RegCloseKey(hkey)
+        return bool(_ktmw32.CommitTransaction(ctypes.c_void_p(txn)))
+    finally:
+        _kernel32.CloseHandle(ctypes.c_void_p(txn))
+
+
+# Policy key handles held open by the daemon (reg_path -> handle), so each
+# tick doesn't have to reopen and close them
+_POLICY_HANDLES = {}
+
+
+def open_policy_keys():
+    """Open the existing browser policy keys once and keep the handles for reuse.
+
+    Missing keys are skipped rather than created; apply_url_blocks creates
+    them when there are URLs to write.
+    """
+    try:
+        import winreg
+    except ImportError:
+        return
+
+    for reg_path in BROWSER_POLICY_KEYS:
+        try:
+            _POLICY_HANDLES[reg_path] = winreg.OpenKeyEx(
+                winreg.HKEY_LOCAL_MACHINE, reg_path, 0, winreg.KEY_SET_VALUE | winreg.KEY_READ
+            )
+        except OSError:
+            pass
+
+
+def close_policy_keys():
+    """Close the handles opened by open_policy_keys()."""
+    try:
+        import winreg
+    except ImportError:
+        return
+
+    for key in _POLICY_HANDLES.values():
+        winreg.CloseKey(key)
+    _POLICY_HANDLES.clear()
+
+
+def _sync_policy_key(key, reg_path, desired):
+    """Bring one open policy key in line with the desired {name: url} values."""
+    import winreg
+
+    # Policy already matches — don't churn the registry
+    current = _read_policy_values(key)
+    if current == desired:
+        return
+
+    # Old entries the new list won't overwrite, and entries that differ
+    stale = [n for n in current if n not in desired]
+    changed = {n: url for n, url in desired.items() if current.get(n) != url}
+
+    # Prefer one atomic transaction; fall back to plain writes
+    if _write_policy_transacted(reg_path, changed, stale):
+        return
+    _clear_policy_values(key, stale)
+    for name, url in changed.items():
+        winreg.SetValueEx(key, name, 0, winreg.REG_SZ, url)
+
+
 def apply_url_blocks(urls):
     """Write blocked URL patterns to Chrome/Edge/Brave URLBlocklist policy."""
     if not urls:
@@ -299,36 +882,38 @@ def apply_url_blocks(urls):
     except ImportError:
         return
 
+    # Values are numbered 1..N
+    desired = {str(idx): url for idx, url in enumerate(urls, start=1)}
+
     for reg_path in BROWSER_POLICY_KEYS:
         try:
+            cached = reg_path in _POLICY_HANDLES
+            if cached:
+                try:
+                    _sync_policy_key(_POLICY_HANDLES[reg_path], reg_path, desired)
+                    continue
+                except OSError:
+                    # Handle went stale (key deleted underneath us) — reopen
+                    winreg.CloseKey(_POLICY_HANDLES.pop(reg_path))
+
             # Create the key (and parent keys) if they don't exist
             key = winreg.CreateKeyEx(
                 winreg.HKEY_LOCAL_MACHINE, reg_path, 0, winreg.KEY_SET_VALUE | winreg.KEY_READ
             )
-
-            # Clear old entries first
             try:
-                i = 0
-                while True:
-                    name, _, _ = winreg.EnumValue(key, i)
-                    try:
-                        winreg.DeleteValue(key, name)
-                    except OSError:
-                        i += 1
-            except OSError:
-                pass
-
-            # Write new entries (1-indexed)
-            for idx, url in enumerate(urls, start=1):
-                winreg.SetValueEx(key, str(idx), 0, winreg.REG_SZ, url)
-
-            winreg.CloseKey(key)
+                _sync_policy_key(key, reg_path, desired)
+            finally:
+                if cached:
+                    _POLICY_HANDLES[reg_path] = key
+                else:
+                    winreg.CloseKey(key)
         except PermissionError:
             pass
         except Exception:
             pass
 
-    print(f"Applied {len(urls)} URL block(s) to browser policies.")
+    if VERBOSE:
+        print(f"Applied {len(urls)} URL block(s) to browser policies.")
 
 
 def remove_url_blocks():
@@ -346,12 +931,9 @@ def remove_url_blocks():
             )
             # Delete all values
             try:
-                while True:
-                    name, _, _ = winreg.EnumValue(key, 0)
-                    winreg.DeleteValue(key, name)
-            except OSError:
-                pass
-            winreg.CloseKey(key)
+                _clear_policy_values(key, _read_policy_values(key))
+            finally:
+                winreg.CloseKey(key)
 
             # Try to remove the now-empty key
             parent_path = "\\".join(reg_path.split("\\")[:-1])
@@ -375,6 +957,110 @@ def remove_url_blocks():
         print("Removed URL blocks from browser policies.")
 
 
+def apply_all_blocks(sites=True, apps=True):
+    """Apply site, URL, and app blocks from a single config load.
+
+    `sites` covers both the hosts file and the browser URL policy; `apps`
+    covers killing blocked processes. Returns the number of apps killed.
+    """
+    config = load_full_config()
+    if sites:
+        block_sites({site.lower() for site in config["blocked_sites"]})
+        apply_url_blocks(config["blocked_urls"])
+    if apps:
+        return kill_blocked_apps(config["blocked_apps"])
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Change notification
+# ---------------------------------------------------------------------------
+
+FILE_LIST_DIRECTORY = 0x0001
+FILE_SHARE_ALL = 0x00000007  # READ | WRITE | DELETE
+OPEN_EXISTING = 3
+FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x00000001
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x00000010
+
+
+def _config_mtime():
+    """Return the config file's st_mtime_ns, or None if it doesn't exist."""
+    try:
+        return os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _changed_names(raw):
+    """Decode the lowercased file names from a FILE_NOTIFY_INFORMATION chain."""
+    names = set()
+    offset = 0
+    while True:
+        # NextEntryOffset, Action, FileNameLength (bytes), then the UTF-16 name
+        next_offset, _, name_len = struct.unpack_from("<III", raw, offset)
+        names.add(raw[offset + 12:offset + 12 + name_len].decode("utf-16-le").lower())
+        if not next_offset:
+            return names
+        offset += next_offset
+
+
+def watch_directory(path, filenames, wake_event):
+    """Set `wake_event` whenever one of `filenames` inside `path` changes.
+
+    Blocks in ReadDirectoryChangesW, so it costs nothing while idle — run it
+    on a daemon thread. Returns straight away if the API isn't available.
+    """
+    wanted = {name.lower() for name in filenames}
+    try:
+        handle = _kernel32.CreateFileW(
+            path, FILE_LIST_DIRECTORY, FILE_SHARE_ALL, None,
+            OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS, None,
+        )
+    except Exception:
+        return
+    if handle in (None, INVALID_HANDLE_VALUE):
+        return
+
+    buf = (wintypes.DWORD * 1024)()  # DWORD-aligned, as the API requires
+    returned = wintypes.DWORD()
+    try:
+        while _kernel32.ReadDirectoryChangesW(
+            ctypes.c_void_p(handle), buf, ctypes.sizeof(buf), False,
+            FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_LAST_WRITE,
+            ctypes.byref(returned), None, None,
+        ):
+            # Zero bytes means the buffer overflowed — assume our file changed
+            if returned.value == 0 or wanted & _changed_names(
+                ctypes.string_at(buf, returned.value)
+            ):
+                wake_event.set()
+    finally:
+        _kernel32.CloseHandle(ctypes.c_void_p(handle))
+
+
+def _install_stop_handler(stop_event, wake_event):
+    """Make Ctrl+C set the stop event, even while the daemon is mid-wait.
+
+    On Windows a console control handler is used, since it runs on its own
+    thread and can wake an Event.wait(); elsewhere a SIGINT handler. Returns
+    the handler, which the caller must keep referenced.
+    """
+    def request_stop(*args):
+        stop_event.set()
+        wake_event.set()
+        return True
+
+    try:
+        handler = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.DWORD)(request_stop)
+        if _kernel32.SetConsoleCtrlHandler(handler, True):
+            return handler
+    except Exception:
+        pass
+    signal.signal(signal.SIGINT, request_stop)
+    return request_stop
+
+
 # ---------------------------------------------------------------------------
 # Daemon lock file
 # ---------------------------------------------------------------------------
@@ -395,18 +1081,17 @@ def remove_lock_file():
 
 def get_daemon_pid():
     """Read the PID from the lock file. Returns None if no daemon is running."""
-    if not os.path.exists(LOCK_FILE):
-        return None
     try:
         with open(LOCK_FILE, "r") as f:
             pid = int(f.read().strip())
-        # Check if the process is still running
-        output = subprocess.check_output(
-            ["tasklist", "/FI", f"PID eq {pid}", "/FO", "CSV", "/NH"],
-            stderr=subprocess.DEVNULL,
-            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
-        )
-        if str(pid) in output.decode("utf-8", errors="ignore"):
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        # Unreadable or garbled lock file
+        remove_lock_file()
+        return None
+    try:
+        if _pid_alive(pid):
             return pid
         # Stale lock file
         remove_lock_file()
@@ -427,7 +1112,8 @@ def stop_daemon():
             ["taskkill", "/F", "/PID", str(pid)],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
-            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            startupinfo=HIDDEN_STARTUPINFO,
+            creationflags=CREATE_NO_WINDOW,
         )
         remove_lock_file()
         print(f"Stopped daemon (PID {pid}).")
@@ -443,23 +1129,14 @@ def stop_daemon():
 
 def show_status():
     """Show which sites, URLs, and apps are currently blocked."""
-    # Sites (hosts file)
-    content = read_hosts()
-    lines = content.split("\n")
-    inside_block = False
+    # Sites (hosts file) — only the region between the markers is parsed
+    buf = read_hosts()
     blocked = []
-
-    for line in lines:
-        if line.strip() == BLOCK_MARKER_START:
-            inside_block = True
-            continue
-        if line.strip() == BLOCK_MARKER_END:
-            inside_block = False
-            continue
-        if inside_block and line.strip():
-            parts = line.strip().split()
-            if len(parts) >= 2:
-                blocked.append(parts[1])
+    start, end = _find_block_region(buf)
+    if start is not None:
+        # One regex pass over the region; entries may list several hostnames
+        for hosts in _ENTRY_RE.findall(buf, start, end if end is not None else len(buf)):
+            blocked.extend(host.decode("ascii", "replace") for host in hosts.split())
 
     if blocked:
         print("Blocked sites (entire domain via hosts file):")
@@ -565,12 +1242,7 @@ def main():
         return
 
     if command == "block":
-        sites = load_config()
-        block_sites(sites)
-        urls = load_blocked_urls()
-        apply_url_blocks(urls)
-        apps = load_blocked_apps()
-        killed = kill_blocked_apps(apps)
+        killed = apply_all_blocks()
         if killed:
             print(f"Killed {killed} blocked app(s).")
 
@@ -583,39 +1255,43 @@ def main():
             print("Usage: python blocker.py add <website>")
             return
         site = sys.argv[2].lower()
-        sites = load_config()
-        if site not in sites:
-            sites.append(site)
-            if not site.startswith("www."):
-                www_site = f"www.{site}"
-                if www_site not in sites:
-                    sites.append(www_site)
-            save_config(sites)
+        data = load_full_config()
+        # Insertion-ordered, so the saved file keeps the user's order and
+        # new entries are appended; only the hosts block is sorted
+        sites = dict.fromkeys(s.lower() for s in data["blocked_sites"])
+        added = [site]
+        if not site.startswith("www."):
+            added.append(f"www.{site}")
+        added = [s for s in added if s not in sites]
+        # Only save and touch the hosts file if something was added
+        if added:
+            sites.update(dict.fromkeys(added))
+            data["blocked_sites"] = list(sites)
+            save_config(data)
             print(f"Added '{site}' to block list.")
+            add_sites_to_block(sites, added)
         else:
             print(f"'{site}' is already in the block list.")
-        block_sites(sites)
 
     elif command == "remove":
         if len(sys.argv) < 3:
             print("Usage: python blocker.py remove <website>")
             return
         site = sys.argv[2].lower()
-        sites = load_config()
-        removed = False
-        if site in sites:
-            sites.remove(site)
-            removed = True
+        data = load_full_config()
+        # Insertion-ordered, so the saved file keeps the user's order
+        sites = dict.fromkeys(s.lower() for s in data["blocked_sites"])
         www_site = f"www.{site}" if not site.startswith("www.") else site[4:]
-        if www_site in sites:
-            sites.remove(www_site)
-            removed = True
+        removed = site in sites or www_site in sites
+        sites.pop(site, None)
+        sites.pop(www_site, None)
         if removed:
-            save_config(sites)
+            data["blocked_sites"] = list(sites)
+            save_config(data)
             print(f"Removed '{site}' from block list.")
+            block_sites(sites)
         else:
             print(f"'{site}' was not in the block list.")
-        block_sites(sites)
 
     elif command == "addapp":
         if len(sys.argv) < 3:
@@ -623,26 +1299,31 @@ def main():
             print("Tip:   python blocker.py listapps  — to see running processes")
             return
         app_name = sys.argv[2]
-        apps = load_blocked_apps()
-        # Case-insensitive check
-        if app_name.lower() not in [a.lower() for a in apps]:
-            apps.append(app_name)
-            save_blocked_apps(apps)
+        data = load_full_config()
+        # Keyed by lowercase name for case-insensitive lookups
+        apps = {a.lower(): a for a in data["blocked_apps"]}
+        target = app_name.lower()
+        if target not in apps:
+            apps[target] = app_name
+            data["blocked_apps"] = list(apps.values())
+            save_config(data)
             print(f"Added '{app_name}' to blocked apps.")
+            # Already-listed apps are handled by the daemon; just kill the new one
+            kill_blocked_apps([app_name])
         else:
             print(f"'{app_name}' is already in the blocked apps list.")
-        kill_blocked_apps(apps)
 
     elif command == "removeapp":
         if len(sys.argv) < 3:
             print("Usage: python blocker.py removeapp <process_name.exe>")
             return
         app_name = sys.argv[2]
-        apps = load_blocked_apps()
-        # Case-insensitive removal
-        new_apps = [a for a in apps if a.lower() != app_name.lower()]
-        if len(new_apps) < len(apps):
-            save_blocked_apps(new_apps)
+        data = load_full_config()
+        # Keyed by lowercase name for case-insensitive removal
+        apps = {a.lower(): a for a in data["blocked_apps"]}
+        if apps.pop(app_name.lower(), None) is not None:
+            data["blocked_apps"] = list(apps.values())
+            save_config(data)
             print(f"Removed '{app_name}' from blocked apps.")
         else:
             print(f"'{app_name}' was not in the blocked apps list.")
@@ -660,7 +1341,8 @@ def main():
             print("     Add /* at the end to block all sub-paths.")
             return
         url_pattern = sys.argv[2]
-        urls = load_blocked_urls()
+        data = load_full_config()
+        urls = data["blocked_urls"]
         if url_pattern not in urls:
             urls.append(url_pattern)
             # Auto-add wildcard variant if not already present
@@ -668,31 +1350,31 @@ def main():
                 wildcard = url_pattern.rstrip("/") + "/*"
                 if wildcard not in urls:
                     urls.append(wildcard)
-            save_blocked_urls(urls)
+            save_config(data)
             print(f"Added '{url_pattern}' to blocked URLs.")
+            apply_url_blocks(urls)
         else:
             print(f"'{url_pattern}' is already in the blocked URLs list.")
-        apply_url_blocks(urls)
 
     elif command == "removeurl":
         if len(sys.argv) < 3:
             print("Usage: python blocker.py removeurl <url_pattern>")
             return
         url_pattern = sys.argv[2]
-        urls = load_blocked_urls()
-        removed = False
+        data = load_full_config()
+        urls = data["blocked_urls"]
         # Remove exact match and wildcard variant
-        to_remove = [url_pattern]
+        to_remove = {url_pattern}
         if not url_pattern.endswith("/*"):
-            to_remove.append(url_pattern.rstrip("/") + "/*")
-        new_urls = [u for u in urls if u not in to_remove]
-        if len(new_urls) < len(urls):
-            save_blocked_urls(new_urls)
+            to_remove.add(url_pattern.rstrip("/") + "/*")
+        count = len(urls)
+        urls[:] = [u for u in urls if u not in to_remove]
+        if len(urls) < count:
+            save_config(data)
             print(f"Removed '{url_pattern}' from blocked URLs.")
-            removed = True
-        if not removed:
+            apply_url_blocks(urls)
+        else:
             print(f"'{url_pattern}' was not in the blocked URLs list.")
-        apply_url_blocks(new_urls)
 
     elif command == "killapps":
         apps = load_blocked_apps()
@@ -715,23 +1397,57 @@ def main():
 
         write_lock_file()
         print(f"Running in daemon mode (PID {os.getpid()}).")
-        print("Blocking sites + URLs + killing apps every 30 seconds.")
+        print(f"Killing blocked apps every {APP_SCAN_INTERVAL} seconds.")
+        print("Re-applying site + URL blocks whenever the config or hosts file")
+        print(f"changes, and every {BLOCK_HEARTBEAT // 60} minutes regardless.")
+
+        # Only real events (killed apps, errors) are logged from here on
+        global VERBOSE
+        VERBOSE = False
+
+        # wake_event cuts the wait short (config/hosts edit or stop request)
+        stop_event = threading.Event()
+        wake_event = threading.Event()
+        # Keep a reference so the ctypes callback isn't garbage collected
+        stop_handler = _install_stop_handler(stop_event, wake_event)  # noqa: F841
+        for path in (CONFIG_FILE, HOSTS_PATH):
+            threading.Thread(
+                target=watch_directory,
+                args=(os.path.dirname(path), [os.path.basename(path)], wake_event),
+                daemon=True,
+            ).start()
+
+        open_policy_keys()
+        woke = True
+        next_heartbeat = 0.0
+        config_mtime = None
         try:
-            while True:
+            while not stop_event.is_set():
+                # Clear before doing the work, so a change that lands while
+                # we're busy (or just after the wait timed out) wakes the
+                # next wait instead of being lost
+                wake_event.clear()
                 try:
-                    sites = load_config()
-                    block_sites(sites)
-                    urls = load_blocked_urls()
-                    apply_url_blocks(urls)
-                    apps = load_blocked_apps()
-                    kill_blocked_apps(apps)
+                    # The mtime check covers config edits where the watcher
+                    # thread isn't available
+                    reapply = (
+                        woke
+                        or time.monotonic() >= next_heartbeat
+                        or _config_mtime() != config_mtime
+                    )
+                    if reapply:
+                        config_mtime = _config_mtime()
+                    # One config load per tick covers sites, URLs, and apps
+                    apply_all_blocks(sites=reapply)
+                    if reapply:
+                        next_heartbeat = time.monotonic() + BLOCK_HEARTBEAT
                 except Exception as e:
                     # Don't let a single iteration failure kill the daemon
                     print(f"Daemon cycle error: {e}")
-                time.sleep(30)
-        except KeyboardInterrupt:
+                woke = wake_event.wait(APP_SCAN_INTERVAL)
             print("\nDaemon stopped.")
         finally:
+            close_policy_keys()
             remove_lock_file()
 
     else:
@@ -1,73 +1,135 @@
 """
 Autostart Setup for Website & App Blocker
 Uses Windows Task Scheduler to run the blocker at logon with admin privileges
-(no UAC prompt needed). Falls back to the registry method if schtasks fails.
+(no UAC prompt needed) — over COM when pywin32 is installed, otherwise via
+schtasks. Falls back to the registry method if both fail.
 """
 
-import ctypes
 import os
 import subprocess
 import sys
 
+from _win_admin import (
+    CREATE_NO_WINDOW, HIDDEN_STARTUPINFO, find_pythonw, is_admin, run_as_admin,
+)
+
+# pywin32 is optional — with it, Task Scheduler is driven over COM instead
+# of spawning schtasks.exe for every create/delete/query
+try:
+    import win32com.client
+except ImportError:
+    win32com = None
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BLOCKER_SCRIPT = os.path.join(SCRIPT_DIR, "blocker.py")
 TASK_NAME = "WebsiteAppBlocker"
+RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
+# Run-key value names to clean up on uninstall, with their removal messages
+_RUN_VALUES = (
+    (TASK_NAME, "Removed from registry startup."),
+    ("WebsiteBlocker", "Removed old 'WebsiteBlocker' registry entry."),
+)
+
+# Last task lookup (found, detail lines); cleared whenever we create or
+# delete the task
+_startup_status_cache = {"result": None}
+
+# Task Scheduler 2.0 COM constants
+TASK_TRIGGER_LOGON = 9
+TASK_ACTION_EXEC = 0
+TASK_CREATE_OR_UPDATE = 6
+TASK_LOGON_INTERACTIVE_TOKEN = 3
+TASK_RUNLEVEL_HIGHEST = 1
+_TASK_STATES = {1: "Disabled", 2: "Queued", 3: "Ready", 4: "Running"}
+
+
+def _task_service():
+    """Connect to the Task Scheduler COM service, or return None if unavailable."""
+    if win32com is None:
+        return None
+    try:
+        service = win32com.client.Dispatch("Schedule.Service")
+        service.Connect()
+        return service
+    except Exception:
+        return None
 
 
-def is_admin():
-    """Check if running as administrator."""
+def _create_task_com(pythonw):
+    """Register the logon task over COM. Returns True on success."""
+    service = _task_service()
+    if service is None:
+        return False
     try:
-        return ctypes.windll.shell32.IsUserAnAdmin()
+        task = service.NewTask(0)
+        task.RegistrationInfo.Description = "Website & App Blocker daemon"
+        # Same task schtasks /SC ONLOGON /RL HIGHEST /DELAY 0000:15 creates
+        task.Principal.RunLevel = TASK_RUNLEVEL_HIGHEST
+        trigger = task.Triggers.Create(TASK_TRIGGER_LOGON)
+        trigger.Delay = "PT15S"
+        action = task.Actions.Create(TASK_ACTION_EXEC)
+        action.Path = pythonw
+        action.Arguments = f'"{BLOCKER_SCRIPT}" daemon'
+        service.GetFolder("\\").RegisterTaskDefinition(
+            TASK_NAME, task, TASK_CREATE_OR_UPDATE, None, None,
+            TASK_LOGON_INTERACTIVE_TOKEN,
+        )
+        return True
     except Exception:
         return False
 
 
-def run_as_admin():
-    """Re-launch with admin privileges."""
-    script = os.path.abspath(__file__)
-    params = " ".join(f'"{arg}"' for arg in sys.argv[1:])
-    ctypes.windll.shell32.ShellExecuteW(
-        None, "runas", sys.executable, f'"{script}" {params}', None, 0
-    )
-    sys.exit(0)
+def _delete_task_com():
+    """Delete the task over COM.
 
-
-def find_pythonw():
-    """Find pythonw.exe path for silent execution."""
-    python_dir = os.path.dirname(sys.executable)
-    pythonw = os.path.join(python_dir, "pythonw.exe")
-    if os.path.exists(pythonw):
-        return pythonw
-    return sys.executable
+    Returns True if it was deleted, False if it didn't exist or couldn't be
+    deleted, and None if COM isn't available.
+    """
+    service = _task_service()
+    if service is None:
+        return None
+    try:
+        service.GetFolder("\\").DeleteTask(TASK_NAME, 0)
+        return True
+    except Exception:
+        return False
 
 
 def add_to_startup():
     """Add the blocker to Windows startup via Task Scheduler (runs elevated)."""
     pythonw = find_pythonw()
+    _startup_status_cache["result"] = None
 
-    # Remove any existing task first (ignore errors)
-    subprocess.call(
-        ["schtasks", "/Delete", "/TN", TASK_NAME, "/F"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
+    if _create_task_com(pythonw):
+        result = 0
+    else:
+        # Remove any existing task first (ignore errors)
+        subprocess.call(
+            ["schtasks", "/Delete", "/TN", TASK_NAME, "/F"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            startupinfo=HIDDEN_STARTUPINFO,
+            creationflags=CREATE_NO_WINDOW,
+        )
 
-    # Create a scheduled task that runs at logon with highest privileges.
-    # /RL HIGHEST = run with admin rights, no UAC prompt.
-    # /DELAY 0000:15 = wait 15 seconds after logon so the network is ready.
-    result = subprocess.call(
-        [
-            "schtasks", "/Create",
-            "/TN", TASK_NAME,
-            "/TR", f'"{pythonw}" "{BLOCKER_SCRIPT}" daemon',
-            "/SC", "ONLOGON",
-            "/RL", "HIGHEST",
-            "/DELAY", "0000:15",
-            "/F",
-        ],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
+        # Create a scheduled task that runs at logon with highest privileges.
+        # /RL HIGHEST = run with admin rights, no UAC prompt.
+        # /DELAY 0000:15 = wait 15 seconds after logon so the network is ready.
+        result = subprocess.call(
+            [
+                "schtasks", "/Create",
+                "/TN", TASK_NAME,
+                "/TR", f'"{pythonw}" "{BLOCKER_SCRIPT}" daemon',
+                "/SC", "ONLOGON",
+                "/RL", "HIGHEST",
+                "/DELAY", "0000:15",
+                "/F",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            startupinfo=HIDDEN_STARTUPINFO,
+            creationflags=CREATE_NO_WINDOW,
+        )
 
     if result == 0:
         print("Website & App Blocker added to Windows startup (Task Scheduler).")
@@ -84,12 +146,11 @@ def _add_to_startup_registry(pythonw):
     """Fallback: add to startup via the registry (may show UAC prompt on login)."""
     import winreg
 
-    reg_key = r"Software\Microsoft\Windows\CurrentVersion\Run"
     command = f'"{pythonw}" "{BLOCKER_SCRIPT}" daemon'
 
     try:
         key = winreg.OpenKey(
-            winreg.HKEY_CURRENT_USER, reg_key, 0, winreg.KEY_SET_VALUE
+            winreg.HKEY_CURRENT_USER, RUN_KEY, 0, winreg.KEY_SET_VALUE
         )
         winreg.SetValueEx(key, TASK_NAME, 0, winreg.REG_SZ, command)
         winreg.CloseKey(key)
@@ -104,48 +165,40 @@ def _add_to_startup_registry(pythonw):
 def remove_from_startup():
     """Remove the blocker from both Task Scheduler and registry."""
     removed = False
+    _startup_status_cache["result"] = None
 
     # Remove from Task Scheduler
-    result = subprocess.call(
-        ["schtasks", "/Delete", "/TN", TASK_NAME, "/F"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
-    if result == 0:
+    deleted = _delete_task_com()
+    if deleted is None:
+        deleted = subprocess.call(
+            ["schtasks", "/Delete", "/TN", TASK_NAME, "/F"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            startupinfo=HIDDEN_STARTUPINFO,
+            creationflags=CREATE_NO_WINDOW,
+        ) == 0
+    if deleted:
         print("Removed from Task Scheduler.")
         removed = True
 
-    # Also remove from registry (in case it was set by an older version)
+    # Also remove from registry (in case it was set by an older version,
+    # including the old 'WebsiteBlocker' name) — one key open for both
     try:
         import winreg
 
-        reg_key = r"Software\Microsoft\Windows\CurrentVersion\Run"
         key = winreg.OpenKey(
-            winreg.HKEY_CURRENT_USER, reg_key, 0, winreg.KEY_SET_VALUE
+            winreg.HKEY_CURRENT_USER, RUN_KEY, 0, winreg.KEY_SET_VALUE
         )
-        winreg.DeleteValue(key, TASK_NAME)
-        winreg.CloseKey(key)
-        print("Removed from registry startup.")
-        removed = True
-    except FileNotFoundError:
-        pass
-    except Exception:
-        pass
-
-    # Also try the old registry name
-    try:
-        import winreg
-
-        reg_key = r"Software\Microsoft\Windows\CurrentVersion\Run"
-        key = winreg.OpenKey(
-            winreg.HKEY_CURRENT_USER, reg_key, 0, winreg.KEY_SET_VALUE
-        )
-        winreg.DeleteValue(key, "WebsiteBlocker")
-        winreg.CloseKey(key)
-        print("Removed old 'WebsiteBlocker' registry entry.")
-        removed = True
-    except FileNotFoundError:
-        pass
+        try:
+            for name, message in _RUN_VALUES:
+                try:
+                    winreg.DeleteValue(key, name)
+                except FileNotFoundError:
+                    continue
+                print(message)
+                removed = True
+        finally:
+            winreg.CloseKey(key)
     except Exception:
         pass
 
@@ -153,23 +206,68 @@ def remove_from_startup():
         print("Website & App Blocker was not in startup.")
 
 
-def check_startup():
-    """Check if the blocker is configured to start automatically."""
-    found = False
+def _query_task_com():
+    """Look up the task over COM. Returns None if COM isn't available."""
+    service = _task_service()
+    if service is None:
+        return None
+    try:
+        task = service.GetFolder("\\").GetTask(TASK_NAME)
+    except Exception:
+        return False, []
+    try:
+        name = task.Name
+        state = _TASK_STATES.get(task.State, "Unknown")
+        next_run = task.NextRunTime
+        # Logon-only tasks have no scheduled next run; COM reports the zero
+        # DATE (1899-12-30) where schtasks shows N/A
+        next_run = "N/A" if next_run.year < 1900 else str(next_run)
+    except Exception:
+        # The task exists; we just couldn't read its details
+        return True, []
+    return True, [f"{name}  Next run: {next_run}  Status: {state}"]
 
-    # Check Task Scheduler
+
+def _query_task_schtasks():
+    """Look up the task with `schtasks /Query`."""
     result = subprocess.run(
         ["schtasks", "/Query", "/TN", TASK_NAME],
         capture_output=True,
         text=True,
+        startupinfo=HIDDEN_STARTUPINFO,
+        creationflags=CREATE_NO_WINDOW,
     )
-    if result.returncode == 0:
+    if result.returncode != 0:
+        return False, []
+    lines = []
+    for line in result.stdout.strip().split("\n"):
+        line = line.strip()
+        if line and TASK_NAME in line:
+            lines.append(line)
+    return True, lines
+
+
+def _query_task():
+    """Return (found, detail lines) for our task, reusing the answer within a process."""
+    if _startup_status_cache["result"] is None:
+        result = _query_task_com()
+        if result is None:
+            result = _query_task_schtasks()
+        _startup_status_cache["result"] = result
+    return _startup_status_cache["result"]
+
+
+def check_startup():
+    """Check if the blocker is configured to start automatically."""
+    found = False
+
+    # Check Task Scheduler
+    task_found, details = _query_task()
+    if task_found:
         print(f"Task Scheduler: ACTIVE (task '{TASK_NAME}')")
         # Show some details
-        for line in result.stdout.strip().split("\n"):
-            line = line.strip()
-            if line and TASK_NAME in line:
-                print(f"  {line}")
+        for line in details:
+            print(f"  {line}")
         found = True
     else:
         print("Task Scheduler: not configured")
@@ -178,12 +276,13 @@ def check_startup():
     try:
         import winreg
 
-        reg_key = r"Software\Microsoft\Windows\CurrentVersion\Run"
         key = winreg.OpenKey(
-            winreg.HKEY_CURRENT_USER, reg_key, 0, winreg.KEY_READ
+            winreg.HKEY_CURRENT_USER, RUN_KEY, 0, winreg.KEY_READ
         )
-        value, _ = winreg.QueryValueEx(key, TASK_NAME)
-        winreg.CloseKey(key)
+        try:
+            value, _ = winreg.QueryValueEx(key, TASK_NAME)
+        finally:
+            winreg.CloseKey(key)
         print(f"Registry: ACTIVE")
         print(f"  Command: {value}")
         found = True
@@ -217,7 +316,7 @@ def main():
     # install/uninstall need admin for Task Scheduler
     if not is_admin():
         print("Requesting administrator privileges...")
-        run_as_admin()
+        run_as_admin(__file__)
         return
 
     if command == "install":
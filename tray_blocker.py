@@ -7,7 +7,6 @@ Requires: pip install pystray Pillow
 import os
 import sys
 import threading
-import time
 
 # Fix for pythonw.exe: redirect stdout/stderr so print() doesn't crash
 _log = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blocker.log")
@@ -24,14 +23,15 @@ except ImportError:
     print("  pip install pystray Pillow")
     sys.exit(1)
 
-# Import the blocker module
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# blocker.py sits next to this script, and the script's directory is
+# already sys.path[0] when it's run directly
 import blocker
+from _win_admin import is_admin, run_as_admin
 
 
 def create_icon_image(color="red"):
     """Create a simple colored icon with a 'B' for Blocker."""
-    img = Image.new("RGB", 64, 64)
+    img = Image.new("RGB", (64, 64))
     draw = ImageDraw.Draw(img)
 
     if color == "red":
@@ -43,41 +43,54 @@ def create_icon_image(color="red"):
     return img
 
 
+# Only two icon states exist — render each once
+_ICONS = {"red": create_icon_image("red"), "gray": create_icon_image("gray")}
+
+
 class TrayBlocker:
     def __init__(self):
         self.is_blocking = False
         self.app_blocking_enabled = True
         self.icon = None
         self.daemon_thread = None
-        self.daemon_running = False
+        self._stop = threading.Event()
         self.check_current_state()
+        self.update_labels()
 
     def check_current_state(self):
         """Check if sites are currently blocked in the hosts file."""
         content = blocker.read_hosts()
-        self.is_blocking = blocker.BLOCK_MARKER_START in content
+        self.is_blocking = blocker.BLOCK_MARKER_START_B in content
+
+    def update_labels(self):
+        """Recompute the menu labels; called whenever the toggles change."""
+        site_status = "ON" if self.is_blocking else "OFF"
+        app_status = "ON" if self.app_blocking_enabled else "OFF"
+        self._status_label = f"Sites: {site_status} | Apps: {app_status}"
+        self._site_label = "Disable Site Blocking" if self.is_blocking else "Enable Site Blocking"
+        self._app_label = "Disable App Blocking" if self.app_blocking_enabled else "Enable App Blocking"
 
     def start_daemon(self):
         """Start the background daemon that re-applies blocks and kills apps."""
-        self.daemon_running = True
+        self._stop.clear()
         self.daemon_thread = threading.Thread(target=self._daemon_loop, daemon=True)
         self.daemon_thread.start()
 
+    def stop_daemon(self):
+        """Wake the daemon and wait briefly for it to finish its current pass."""
+        self._stop.set()
+        if self.daemon_thread is not None:
+            self.daemon_thread.join(timeout=2)
+
     def _daemon_loop(self):
         """Background loop: re-apply site blocks, URL blocks, and kill blocked apps."""
-        while self.daemon_running:
+        while not self._stop.is_set():
             try:
-                if self.is_blocking:
-                    sites = blocker.load_config()
-                    blocker.block_sites(sites)
-                    urls = blocker.load_blocked_urls()
-                    blocker.apply_url_blocks(urls)
-                if self.app_blocking_enabled:
-                    apps = blocker.load_blocked_apps()
-                    blocker.kill_blocked_apps(apps)
+                blocker.apply_all_blocks(self.is_blocking, self.app_blocking_enabled)
             except Exception:
                 pass
-            time.sleep(30)
+            if self._stop.wait(30):
+                break
 
     def toggle_blocking(self, icon, item):
         """Toggle website + URL blocking on/off."""
@@ -85,16 +98,14 @@ class TrayBlocker:
             blocker.unblock_sites()
             blocker.remove_url_blocks()
             self.is_blocking = False
-            icon.icon = create_icon_image("gray")
+            icon.icon = _ICONS["gray"]
             icon.notify("Sites & URLs unblocked", "Website & App Blocker")
         else:
-            sites = blocker.load_config()
-            blocker.block_sites(sites)
-            urls = blocker.load_blocked_urls()
-            blocker.apply_url_blocks(urls)
+            blocker.apply_all_blocks(apps=False)
             self.is_blocking = True
-            icon.icon = create_icon_image("red")
+            icon.icon = _ICONS["red"]
             icon.notify("Sites & URLs blocked", "Website & App Blocker")
+        self.update_labels()
         icon.update_menu()
 
     def toggle_app_blocking(self, icon, item):
@@ -102,6 +113,7 @@ class TrayBlocker:
         self.app_blocking_enabled = not self.app_blocking_enabled
         state = "enabled" if self.app_blocking_enabled else "disabled"
         icon.notify(f"App blocking {state}", "Website & App Blocker")
+        self.update_labels()
         icon.update_menu()
 
     def kill_apps_now(self, icon, item):
@@ -113,35 +125,24 @@ class TrayBlocker:
         else:
             icon.notify("No blocked apps running", "Website & App Blocker")
 
-    def get_status_text(self, item):
-        site_status = "ON" if self.is_blocking else "OFF"
-        app_status = "ON" if self.app_blocking_enabled else "OFF"
-        return f"Sites: {site_status} | Apps: {app_status}"
-
     def open_config(self, icon, item):
         """Open the config file in the default text editor."""
         os.startfile(blocker.CONFIG_FILE)
 
     def refresh_blocks(self, icon, item):
         """Re-read config and re-apply blocks."""
-        if self.is_blocking:
-            sites = blocker.load_config()
-            blocker.block_sites(sites)
-            urls = blocker.load_blocked_urls()
-            blocker.apply_url_blocks(urls)
-        if self.app_blocking_enabled:
-            apps = blocker.load_blocked_apps()
-            blocker.kill_blocked_apps(apps)
+        blocker.apply_all_blocks(self.is_blocking, self.app_blocking_enabled)
         icon.notify("Block list refreshed", "Website & App Blocker")
 
     def quit_app(self, icon, item):
         """Quit the tray application (blocks stay active)."""
-        self.daemon_running = False
+        self.stop_daemon()
         icon.stop()
 
     def quit_and_unblock(self, icon, item):
         """Quit and remove all blocks."""
-        self.daemon_running = False
+        # Stop the daemon first so it can't re-apply blocks behind us
+        self.stop_daemon()
         blocker.unblock_sites()
         blocker.remove_url_blocks()
         icon.stop()
@@ -151,16 +152,11 @@ class TrayBlocker:
         color = "red" if self.is_blocking else "gray"
 
         menu = pystray.Menu(
-            pystray.MenuItem(self.get_status_text, None, enabled=False),
+            # Labels are precomputed by update_labels(); these just read them
+            pystray.MenuItem(lambda item: self._status_label, None, enabled=False),
             pystray.Menu.SEPARATOR,
-            pystray.MenuItem(
-                lambda item: "Disable Site Blocking" if self.is_blocking else "Enable Site Blocking",
-                self.toggle_blocking,
-            ),
-            pystray.MenuItem(
-                lambda item: "Disable App Blocking" if self.app_blocking_enabled else "Enable App Blocking",
-                self.toggle_app_blocking,
-            ),
+            pystray.MenuItem(lambda item: self._site_label, self.toggle_blocking),
+            pystray.MenuItem(lambda item: self._app_label, self.toggle_app_blocking),
             pystray.MenuItem("Kill Blocked Apps Now", self.kill_apps_now),
             pystray.Menu.SEPARATOR,
             pystray.MenuItem("Refresh Block List", self.refresh_blocks),
@@ -171,21 +167,16 @@ class TrayBlocker:
         )
 
         self.icon = pystray.Icon(
-            "WebsiteAppBlocker", create_icon_image(color), "Website & App Blocker", menu
+            "WebsiteAppBlocker", _ICONS[color], "Website & App Blocker", menu
         )
 
-        # Auto-block on startup
+        # Auto-block on startup: sites, URLs, and running blocked apps.
+        # block_sites is a no-op if the hosts file is already up to date.
+        blocker.apply_all_blocks()
         if not self.is_blocking:
-            sites = blocker.load_config()
-            blocker.block_sites(sites)
             self.is_blocking = True
-            self.icon.icon = create_icon_image("red")
-
-        # Apply URL blocks and kill blocked apps immediately
-        urls = blocker.load_blocked_urls()
-        blocker.apply_url_blocks(urls)
-        apps = blocker.load_blocked_apps()
-        blocker.kill_blocked_apps(apps)
+            self.update_labels()
+            self.icon.icon = _ICONS["red"]
 
         # Start background daemon
         self.start_daemon()
@@ -194,11 +185,14 @@ class TrayBlocker:
 
 
 def main():
-    if not blocker.is_admin():
+    if not is_admin():
         print("Requesting administrator privileges...")
-        blocker.run_as_admin()
+        # Relaunch the tray itself, not blocker.py
+        run_as_admin(__file__)
         return
 
+    # The tray re-applies blocks every 30s; skip the routine status lines
+    blocker.VERBOSE = False
     app = TrayBlocker()
     app.run()
 